@@ -0,0 +1,15 @@
+# Authentication dependencies
+# Bearer-token guard for the risk endpoints
+
+from fastapi import Depends
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+security = HTTPBearer()
+
+def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Verify the bearer token (placeholder)"""
+    # Placeholder implementation - replace with JWT validation
+    return {"user_id": "demo-user", "token": credentials.credentials}
+
+async def get_current_user(token_data: dict = Depends(verify_token)) -> dict:
+    return token_data
@@ -0,0 +1,8 @@
+# Database session dependency
+
+from typing import AsyncIterator, Optional
+
+async def get_db_session() -> AsyncIterator[Optional[object]]:
+    """Yield a database session (placeholder)"""
+    # Placeholder implementation - replace with an async SQLAlchemy session
+    yield None
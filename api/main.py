@@ -3,10 +3,15 @@
 
 from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import HTTPBearer
-import redis
+from fastapi.responses import ORJSONResponse
 import logging
-from datetime import datetime
+
+from routes.risk_api import router as risk_router, risk_engine
+
+# Compile the JIT kernels once per worker, before it accepts traffic. This runs at
+# import so it stays on the main thread: compiling parallel kernels from a worker
+# thread (e.g. TestClient's lifespan portal) can deadlock.
+risk_engine.warm_up()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -14,7 +19,8 @@ app = FastAPI(
     description="Enterprise quantum-inspired risk modeling platform",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -26,8 +32,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Security
-security = HTTPBearer()
+# Risk endpoints, including /health
+app.include_router(risk_router)
 
 @app.get("/")
 async def root():
@@ -38,21 +44,6 @@ async def root():
         "status": "operational"
     }
 
-@app.get("/health")
-async def health_check():
-    """System health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "version": "1.0.0",
-        "services": {
-            "api": "operational",
-            "database": "connected",
-            "cache": "available",
-            "quantum_engine": "ready"
-        }
-    }
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
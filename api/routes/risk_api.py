@@ -2,69 +2,99 @@
 # [Version 11-01-2025 15:50:00]
 # /api/routes/risk_api.py
 
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, status
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, Field, validator
-from typing import Dict, List, Optional, Union
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+from typing import Dict, List, Optional, Tuple, Type, TypeVar, Union
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from decimal import Decimal
 import asyncio
-import redis
-import json
+import os
+import numpy as np
+import pandas as pd
+import orjson
+import time
+from scipy.linalg import cholesky
+from scipy.linalg.blas import dsyrk
+from redis.asyncio import Redis, BlockingConnectionPool
+from redis.exceptions import RedisError
 import uuid
-
-from .calculations import QuantumRiskEngine, Portfolio, QuantumPortfolioOptimizer
-from .database import get_db_session
-from .auth import verify_token, get_current_user
+import msgpack
+import xxhash
+import zstandard
+
+from risk.calculations import QuantumRiskEngine, Portfolio, QuantumPortfolioOptimizer, rng
+from core.database import get_db_session
+from core.auth import verify_token, get_current_user
+
+# Request models build their core validators eagerly at class definition
+REQUEST_MODEL_CONFIG = ConfigDict(
+    defer_build=False,
+    validate_assignment=False,
+    str_strip_whitespace=False,
+    extra='forbid'
+)
 
 # Pydantic models for request/response validation
 class PortfolioPosition(BaseModel):
     """Individual portfolio position"""
-    symbol: str = Field(..., regex="^[A-Z]{1,10}$", description="Valid ticker symbol")
+    model_config = REQUEST_MODEL_CONFIG
+    
+    symbol: str = Field(..., pattern="^[A-Z]{1,10}$", description="Valid ticker symbol")
     weight: float = Field(..., ge=0, le=1, description="Portfolio weight (0-1)")
     market_value: Optional[float] = Field(None, gt=0, description="Market value in USD")
     quantity: Optional[float] = Field(None, description="Number of shares/units")
-    
-    @validator('symbol')
-    def validate_symbol(cls, v):
-        # Additional validation for symbol format
-        if not v.isalpha():
-            raise ValueError('Symbol must contain only letters')
-        return v.upper()
 
 class PortfolioRequest(BaseModel):
     """Portfolio risk calculation request"""
+    model_config = REQUEST_MODEL_CONFIG
+    
     portfolio_id: str = Field(..., description="Unique portfolio identifier")
     name: Optional[str] = Field(None, description="Portfolio name")
-    positions: List[PortfolioPosition] = Field(..., min_items=1, max_items=500)
+    positions: List[PortfolioPosition] = Field(..., min_length=1, max_length=500)
     base_currency: str = Field("USD", description="Base currency")
     
-    @validator('positions')
+    @field_validator('positions')
+    @classmethod
     def validate_portfolio_weights(cls, v):
-        total_weight = sum(pos.weight for pos in v)
+        total_weight = float(np.fromiter((pos.weight for pos in v), dtype=np.float64, count=len(v)).sum())
         if abs(total_weight - 1.0) > 0.01:  # Allow 1% tolerance
             raise ValueError(f'Portfolio weights must sum to 1.0, got {total_weight}')
         return v
 
 class RiskCalculationRequest(BaseModel):
     """Risk calculation parameters"""
+    model_config = REQUEST_MODEL_CONFIG
+    
     confidence_level: float = Field(0.95, ge=0.90, le=0.999, description="VaR confidence level")
     time_horizon: int = Field(1, ge=1, le=252, description="Time horizon in days")
-    method: str = Field("quantum_mc", regex="^(historical|parametric|monte_carlo|quantum_mc)$")
-    num_simulations: Optional[int] = Field(10000, ge=1000, le=100000, description="Monte Carlo simulations")
+    method: str = Field("quantum_mc", pattern="^(historical|parametric|monte_carlo|quantum_mc)$")
+    num_simulations: int = Field(10000, ge=1000, le=100000, description="Monte Carlo simulations")
     risk_free_rate: float = Field(0.02, ge=0, le=0.10, description="Risk-free rate")
 
+class VaRRequest(BaseModel):
+    """VaR endpoint body: portfolio plus calculation parameters"""
+    model_config = REQUEST_MODEL_CONFIG
+    
+    portfolio_request: PortfolioRequest
+    risk_params: RiskCalculationRequest
+
 class OptimizationRequest(BaseModel):
     """Portfolio optimization parameters"""
+    model_config = REQUEST_MODEL_CONFIG
+    
     expected_returns: List[float] = Field(..., description="Expected returns for each asset")
     symbols: List[str] = Field(..., description="Asset symbols")
     risk_aversion: float = Field(1.0, ge=0.1, le=10.0, description="Risk aversion parameter")
     constraints: Optional[Dict] = Field(None, description="Portfolio constraints")
-    optimization_method: str = Field("quantum_inspired", regex="^(quantum_inspired|classical_mv|risk_parity)$")
+    optimization_method: str = Field("quantum_inspired", pattern="^(quantum_inspired|classical_mv|risk_parity)$")
 
 class StressTestRequest(BaseModel):
     """Stress testing scenarios"""
+    model_config = REQUEST_MODEL_CONFIG
+    
     portfolio_id: str
     scenarios: Dict[str, Dict[str, float]] = Field(
         ..., 
@@ -105,31 +135,57 @@ class HealthCheckResponse(BaseModel):
     redis_status: str
     quantum_engine_status: str
 
-# FastAPI application setup
-app = FastAPI(
-    title="Quantum Risk API",
-    description="Enterprise quantum-inspired risk modeling platform",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "https://quantum-risk-api.vercel.app"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Security
-security = HTTPBearer()
+# Risk API router, mounted by the application in api/main.py
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Initialize services
 risk_engine = QuantumRiskEngine(quantum_enabled=True)
 portfolio_optimizer = QuantumPortfolioOptimizer(quantum_enabled=True)
-redis_client = redis.Redis(host='localhost', port=6379, decode_responses=True)
+redis_pool = BlockingConnectionPool.from_url(
+    os.getenv("REDIS_URL", "redis://localhost:6379"), max_connections=50
+)
+redis_client = Redis(connection_pool=redis_pool)
+
+# Covariance/Cholesky cache, keyed by sorted symbol set: in-process LRU in front of Redis
+COVARIANCE_CACHE_TTL = 3600
+COVARIANCE_LRU_SIZE = 256
+covariance_lru: "OrderedDict[Tuple[str, ...], Tuple[float, np.ndarray, np.ndarray]]" = OrderedDict()
+zstd_compressor = zstandard.ZstdCompressor()
+zstd_decompressor = zstandard.ZstdDecompressor()
+
+# Request body parsing
+RequestModelT = TypeVar("RequestModelT", bound=BaseModel)
+
+async def parse_request_body(request: Request, model: Type[RequestModelT]) -> RequestModelT:
+    """Validate the raw JSON body in pydantic-core, skipping the json.loads pass"""
+    try:
+        return model.model_validate_json(await request.body())
+    except ValidationError as e:
+        # Same error shape FastAPI produces for declared body parameters
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+def _inline_schema_refs(node: Union[Dict, List], defs: Dict) -> Union[Dict, List]:
+    """Replace local $defs references with the referenced schemas"""
+    if isinstance(node, list):
+        return [_inline_schema_refs(item, defs) for item in node]
+    if not isinstance(node, dict):
+        return node
+    if "$ref" in node:
+        return _inline_schema_refs(defs[node["$ref"].rsplit("/", 1)[-1]], defs)
+    return {key: _inline_schema_refs(value, defs) for key, value in node.items()}
+
+def request_body_openapi(model: Type[BaseModel]) -> Dict:
+    """OpenAPI requestBody for routes that read their body via parse_request_body"""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _inline_schema_refs(schema, defs)}}
+        }
+    }
 
 # Dependency injection
 async def get_risk_engine():
@@ -143,15 +199,18 @@ async def get_redis():
 
 # API Routes
 
-@app.get("/health", response_model=HealthCheckResponse)
+@router.get("/health", response_model=HealthCheckResponse)
 async def health_check():
     """System health check endpoint"""
     try:
         # Check database connectivity
         db_status = "healthy"  # Implement actual DB check
         
-        # Check Redis connectivity
-        redis_status = "healthy" if redis_client.ping() else "unhealthy"
+        # Check Redis connectivity; an unreachable cache degrades rather than fails the API
+        try:
+            redis_status = "healthy" if await redis_client.ping() else "unhealthy"
+        except RedisError:
+            redis_status = "unhealthy"
         
         # Check quantum engine
         quantum_status = "healthy" if risk_engine.quantum_enabled else "disabled"
@@ -173,47 +232,54 @@ async def health_check():
             detail=f"Health check failed: {str(e)}"
         )
 
-@app.post("/api/portfolio/var", response_model=RiskMetricsResponse)
+@router.post(
+    "/api/portfolio/var", response_model=RiskMetricsResponse, response_class=ORJSONResponse,
+    openapi_extra=request_body_openapi(VaRRequest)
+)
 async def calculate_var(
-    portfolio_request: PortfolioRequest,
-    risk_params: RiskCalculationRequest,
+    request: Request,
     background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user),
     risk_engine: QuantumRiskEngine = Depends(get_risk_engine),
     redis_client = Depends(get_redis)
 ):
     """Calculate Value-at-Risk for portfolio"""
+    var_request = await parse_request_body(request, VaRRequest)
+    portfolio_request = var_request.portfolio_request
+    risk_params = var_request.risk_params
+    
     try:
         calculation_id = str(uuid.uuid4())
         start_time = datetime.utcnow()
+        start_ns = time.perf_counter_ns()
         
-        # Check cache first
-        cache_key = f"var:{portfolio_request.portfolio_id}:{hash(str(risk_params))}"
-        cached_result = redis_client.get(cache_key)
+        # Check cache first; Redis is best-effort, so an outage means a cache miss
+        # Key on positions as well as parameters: a portfolio_id can be re-posted with new holdings
+        cache_key = build_cache_key("var", portfolio_request.portfolio_id, var_request.model_dump())
+        try:
+            cached_result = await redis_client.get(cache_key)
+        except RedisError:
+            cached_result = None
         
         if cached_result:
-            cached_data = json.loads(cached_result)
+            cached_data = orjson.loads(cached_result)
             cached_data["calculation_id"] = calculation_id
             cached_data["from_cache"] = True
             return RiskMetricsResponse(**cached_data)
         
         # Convert request to Portfolio object
-        portfolio = Portfolio(
-            positions={pos.symbol: pos.weight for pos in portfolio_request.positions},
-            prices={pos.symbol: pos.market_value or 100.0 for pos in portfolio_request.positions}
-        )
+        portfolio = Portfolio.from_positions(portfolio_request.positions)
         
         # Load historical data (placeholder - implement actual data loading)
-        portfolio.returns = await load_historical_returns(
-            [pos.symbol for pos in portfolio_request.positions]
-        )
+        portfolio.returns = await load_historical_returns(portfolio.symbols.tolist())
         
         # Calculate VaR
         var_result = risk_engine.calculate_var(
             portfolio=portfolio,
             confidence_level=risk_params.confidence_level,
             time_horizon=risk_params.time_horizon,
-            method=risk_params.method
+            method=risk_params.method,
+            num_simulations=risk_params.num_simulations
         )
         
         # Calculate comprehensive risk metrics
@@ -228,6 +294,9 @@ async def calculate_var(
             "timestamp": start_time,
             "portfolio_id": portfolio_request.portfolio_id,
             "risk_metrics": {
+                "var": var_result["var_amount"],
+                "cvar": var_result["cvar_amount"],
+                "var_percentage": var_result["var_percentage"],
                 "var_95": comprehensive_metrics.var_95,
                 "var_99": comprehensive_metrics.var_99,
                 "cvar_95": comprehensive_metrics.cvar_95,
@@ -246,11 +315,17 @@ async def calculate_var(
                 "quantum_enhancement": risk_engine.quantum_enabled
             },
             "warnings": validate_portfolio_risk(portfolio_request),
-            "computation_time_ms": (datetime.utcnow() - start_time).total_seconds() * 1000
+            "computation_time_ms": (time.perf_counter_ns() - start_ns) * 1e-6
         }
         
         # Cache result for 1 hour
-        redis_client.setex(cache_key, 3600, json.dumps(response_data, default=str))
+        try:
+            await redis_client.setex(
+                cache_key, 3600,
+                orjson.dumps(response_data, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY)
+            )
+        except RedisError:
+            pass
         
         # Log calculation in background
         background_tasks.add_task(
@@ -269,13 +344,18 @@ async def calculate_var(
             detail=f"VaR calculation failed: {str(e)}"
         )
 
-@app.post("/api/portfolio/optimize", response_model=OptimizationResponse)
+@router.post(
+    "/api/portfolio/optimize", response_model=OptimizationResponse, response_class=ORJSONResponse,
+    openapi_extra=request_body_openapi(OptimizationRequest)
+)
 async def optimize_portfolio(
-    optimization_request: OptimizationRequest,
+    request: Request,
     current_user: dict = Depends(get_current_user),
     optimizer: QuantumPortfolioOptimizer = Depends(get_optimizer)
 ):
     """Optimize portfolio using quantum-inspired algorithms"""
+    optimization_request = await parse_request_body(request, OptimizationRequest)
+    
     try:
         optimization_id = str(uuid.uuid4())
         start_time = datetime.utcnow()
@@ -287,20 +367,26 @@ async def optimize_portfolio(
                 detail="Expected returns and symbols must have same length"
             )
         
-        # Load covariance matrix (placeholder - implement actual data loading)
-        covariance_matrix = await load_covariance_matrix(optimization_request.symbols)
+        # Cached factors are in sorted-symbol order; optimize in that order
+        order = np.argsort(np.array(optimization_request.symbols), kind="stable")
+        covariance_matrix, cholesky_factor = await load_covariance_factors(optimization_request.symbols)
         
         # Run optimization
         optimization_result = optimizer.optimize_portfolio(
-            expected_returns=np.array(optimization_request.expected_returns),
+            expected_returns=np.array(optimization_request.expected_returns)[order],
             covariance_matrix=covariance_matrix,
-            constraints=optimization_request.constraints or {}
+            constraints=optimization_request.constraints or {},
+            cholesky_factor=cholesky_factor
         )
         
+        # Map weights back to request symbol order
+        optimal_weights = np.empty(len(order))
+        optimal_weights[order] = optimization_result["weights"]
+        
         return OptimizationResponse(
             optimization_id=optimization_id,
             timestamp=start_time,
-            optimal_weights=optimization_result["weights"].tolist(),
+            optimal_weights=optimal_weights.tolist(),
             expected_return=optimization_result["expected_return"],
             volatility=optimization_result["volatility"],
             sharpe_ratio=optimization_result["sharpe_ratio"],
@@ -318,13 +404,18 @@ async def optimize_portfolio(
             detail=f"Portfolio optimization failed: {str(e)}"
         )
 
-@app.post("/api/portfolio/stress-test")
+@router.post(
+    "/api/portfolio/stress-test", response_class=ORJSONResponse,
+    openapi_extra=request_body_openapi(StressTestRequest)
+)
 async def stress_test_portfolio(
-    stress_request: StressTestRequest,
+    request: Request,
     current_user: dict = Depends(get_current_user),
     risk_engine: QuantumRiskEngine = Depends(get_risk_engine)
 ):
     """Perform stress testing on portfolio"""
+    stress_request = await parse_request_body(request, StressTestRequest)
+    
     try:
         # Load portfolio data
         portfolio_data = await load_portfolio_by_id(stress_request.portfolio_id)
@@ -335,26 +426,39 @@ async def stress_test_portfolio(
                 detail="Portfolio not found"
             )
         
+        positions = portfolio_data["positions"]
         portfolio = Portfolio(
-            positions=portfolio_data["positions"],
-            prices=portfolio_data["prices"]
+            symbols=np.array(list(positions), dtype=object),
+            weights=np.fromiter(positions.values(), dtype=np.float64, count=len(positions)),
+            prices=np.fromiter(
+                (portfolio_data["prices"][symbol] for symbol in positions),
+                dtype=np.float64, count=len(positions)
+            )
         )
         
         # Run stress tests
-        stress_results = risk_engine.stress_test_portfolio(
+        scenario_names, impacts = risk_engine.stress_test_portfolio(
             portfolio=portfolio,
             scenarios=stress_request.scenarios
         )
         
         # Format results
-        formatted_results = []
-        for scenario_name, impact in stress_results.items():
-            formatted_results.append({
+        severities = classify_stress_severity(impacts)
+        formatted_results = [
+            {
                 "scenario": scenario_name,
                 "portfolio_impact_percentage": impact * 100,
-                "portfolio_impact_amount": impact * sum(portfolio.positions.values()),
-                "severity": classify_stress_severity(impact)
-            })
+                "portfolio_impact_amount": impact * portfolio.portfolio_value,
+                "severity": severity
+            }
+            for scenario_name, impact, severity in zip(
+                scenario_names, impacts.tolist(), severities.tolist()
+            )
+        ]
+        
+        # Extreme scenarios by index into the impacts array
+        worst_i = int(impacts.argmin())
+        best_i = int(impacts.argmax())
         
         return {
             "stress_test_id": str(uuid.uuid4()),
@@ -362,9 +466,9 @@ async def stress_test_portfolio(
             "timestamp": datetime.utcnow(),
             "results": formatted_results,
             "summary": {
-                "worst_case_scenario": min(stress_results.items(), key=lambda x: x[1]),
-                "best_case_scenario": max(stress_results.items(), key=lambda x: x[1]),
-                "scenarios_tested": len(stress_results)
+                "worst_case_scenario": (scenario_names[worst_i], float(impacts[worst_i])),
+                "best_case_scenario": (scenario_names[best_i], float(impacts[best_i])),
+                "scenarios_tested": len(scenario_names)
             }
         }
         
@@ -374,10 +478,10 @@ async def stress_test_portfolio(
             detail=f"Stress testing failed: {str(e)}"
         )
 
-@app.get("/api/portfolio/{portfolio_id}/history")
+@router.get("/api/portfolio/{portfolio_id}/history")
 async def get_portfolio_risk_history(
     portfolio_id: str,
-    days: int = Field(30, ge=1, le=365),
+    days: int = Query(30, ge=1, le=365),
     current_user: dict = Depends(get_current_user)
 ):
     """Get historical risk metrics for portfolio"""
@@ -388,7 +492,7 @@ async def get_portfolio_risk_history(
         return {
             "portfolio_id": portfolio_id,
             "time_period_days": days,
-            "historical_metrics": history_data,
+            "historical_metrics": history_data.to_dict(orient="records"),
             "summary_statistics": calculate_historical_summary(history_data)
         }
         
@@ -400,63 +504,111 @@ async def get_portfolio_risk_history(
 
 # Utility functions
 
+def build_cache_key(namespace: str, scope: str, payload: Union[Dict, List]) -> str:
+    """Process-independent cache key from an xxh3 digest of the msgpack-encoded payload"""
+    digest = xxhash.xxh3_64_hexdigest(msgpack.packb(payload, use_bin_type=True))
+    return f"{namespace}:{scope}:{digest}"
+
 def validate_portfolio_risk(portfolio_request: PortfolioRequest) -> List[str]:
     """Validate portfolio for potential risk issues"""
     warnings = []
+    positions = portfolio_request.positions
+    weights = np.fromiter((pos.weight for pos in positions), dtype=np.float64, count=len(positions))
     
     # Check for concentration risk
-    max_weight = max(pos.weight for pos in portfolio_request.positions)
+    max_weight = weights.max()
     if max_weight > 0.3:
         warnings.append(f"High concentration risk: {max_weight:.1%} in single position")
     
     # Check for minimum diversification
-    if len(portfolio_request.positions) < 5:
+    if weights.size < 5:
         warnings.append("Low diversification: fewer than 5 positions")
     
     # Check for micro positions
-    micro_positions = [pos for pos in portfolio_request.positions if pos.weight < 0.01]
-    if len(micro_positions) > 10:
-        warnings.append(f"Many micro positions ({len(micro_positions)}) may increase transaction costs")
+    micro_count = int((weights < 0.01).sum())
+    if micro_count > 10:
+        warnings.append(f"Many micro positions ({micro_count}) may increase transaction costs")
     
     return warnings
 
-def classify_stress_severity(impact: float) -> str:
-    """Classify stress test impact severity"""
-    if impact >= 0:
-        return "positive"
-    elif impact > -0.05:
-        return "low"
-    elif impact > -0.15:
-        return "moderate"
-    elif impact > -0.30:
-        return "high"
-    else:
-        return "severe"
+# Upper-inclusive severity bands; the last edge is the largest negative float so 0.0 is "positive"
+STRESS_THRESHOLDS = np.array([-0.30, -0.15, -0.05, np.nextafter(0.0, -1.0)])
+STRESS_LABELS = np.array(["severe", "high", "moderate", "low", "positive"])
+
+def classify_stress_severity(impacts: np.ndarray) -> np.ndarray:
+    """Classify stress test impact severities in one binary search per impact"""
+    return STRESS_LABELS[np.searchsorted(STRESS_THRESHOLDS, impacts)]
 
 async def load_historical_returns(symbols: List[str]) -> pd.DataFrame:
     """Load historical returns for symbols (placeholder)"""
-    import pandas as pd
-    import numpy as np
-    
     # Placeholder implementation - replace with actual data source
     dates = pd.date_range(end=datetime.now(), periods=252, freq='D')
-    returns_data = {}
     
-    for symbol in symbols:
-        # Generate synthetic returns for demonstration
-        returns_data[symbol] = np.random.normal(0.001, 0.02, len(dates))
+    # Generate synthetic returns for demonstration in one draw; float64 is what the
+    # risk kernels consume, so no per-method conversion copy is needed
+    returns_data = rng.standard_normal((len(dates), len(symbols)))
+    returns_data *= 0.02
+    returns_data += 0.001
     
-    return pd.DataFrame(returns_data, index=dates)
+    return pd.DataFrame(returns_data, index=dates, columns=symbols, copy=False)
 
 async def load_covariance_matrix(symbols: List[str]) -> np.ndarray:
     """Load covariance matrix for symbols (placeholder)"""
-    import numpy as np
-    
     # Placeholder implementation
     n = len(symbols)
     # Generate a positive definite covariance matrix
     A = np.random.randn(n, n) * 0.01
-    return np.dot(A, A.T) + np.eye(n) * 0.0004  # Add small diagonal for stability
+    # Symmetric rank-k update fills only the upper triangle of A @ A.T
+    C = dsyrk(1.0, A, lower=0)
+    C += np.triu(C, 1).T
+    C.flat[::n + 1] += 0.0004  # Add small diagonal for stability
+    return C
+
+async def load_covariance_factors(symbols: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Covariance matrix and its lower Cholesky factor for a symbol set
+    
+    Both are ordered by sorted symbol and shared between requests, so they are
+    returned read-only. Lookups go in-process LRU -> Redis -> recompute; Redis
+    is best-effort, so an outage falls through to the recompute.
+    """
+    symbols_key = tuple(sorted(symbols))
+    now = time.monotonic()
+    
+    cached = covariance_lru.get(symbols_key)
+    if cached is not None and cached[0] > now:
+        covariance_lru.move_to_end(symbols_key)
+        return cached[1], cached[2]
+    
+    n = len(symbols_key)
+    cache_key = build_cache_key("cov", str(n), list(symbols_key))
+    try:
+        payload = await redis_client.get(cache_key)
+    except RedisError:
+        payload = None
+    
+    if payload:
+        factors = np.frombuffer(zstd_decompressor.decompress(payload), dtype=np.float64)
+        covariance_matrix, cholesky_factor = factors.reshape(2, n, n)
+    else:
+        covariance_matrix = await load_covariance_matrix(list(symbols_key))
+        cholesky_factor = cholesky(covariance_matrix, lower=True, check_finite=False)
+        try:
+            await redis_client.setex(
+                cache_key, COVARIANCE_CACHE_TTL,
+                zstd_compressor.compress(np.stack([covariance_matrix, cholesky_factor]).tobytes())
+            )
+        except RedisError:
+            pass
+        covariance_matrix.setflags(write=False)
+        cholesky_factor.setflags(write=False)
+    
+    covariance_lru[symbols_key] = (now + COVARIANCE_CACHE_TTL, covariance_matrix, cholesky_factor)
+    covariance_lru.move_to_end(symbols_key)
+    if len(covariance_lru) > COVARIANCE_LRU_SIZE:
+        covariance_lru.popitem(last=False)
+    
+    return covariance_matrix, cholesky_factor
 
 async def load_portfolio_by_id(portfolio_id: str) -> Optional[Dict]:
     """Load portfolio data by ID (placeholder)"""
@@ -466,29 +618,27 @@ async def load_portfolio_by_id(portfolio_id: str) -> Optional[Dict]:
         "prices": {"AAPL": 150.0, "GOOGL": 2800.0, "TSLA": 800.0, "MSFT": 350.0}
     }
 
-async def load_portfolio_risk_history(portfolio_id: str, days: int) -> List[Dict]:
-    """Load historical risk metrics (placeholder)"""
+RISK_HISTORY_COLUMNS = ["date", "var_95", "var_99", "vol", "sharpe"]
+
+async def load_portfolio_risk_history(portfolio_id: str, days: int) -> pd.DataFrame:
+    """Load historical risk metrics, one row per day (placeholder)"""
     # Placeholder implementation
-    return []
+    return pd.DataFrame(columns=RISK_HISTORY_COLUMNS)
 
-def calculate_historical_summary(history_data: List[Dict]) -> Dict:
+def calculate_historical_summary(history_data: pd.DataFrame) -> Dict:
     """Calculate summary statistics for historical data"""
-    if not history_data:
+    if history_data.empty:
         return {}
     
-    # Placeholder implementation
+    var_95 = history_data["var_95"]
     return {
-        "average_var": 0.0,
-        "max_var": 0.0,
-        "min_var": 0.0,
-        "volatility_trend": "stable"
+        "average_var": float(var_95.mean()),
+        "max_var": float(var_95.max()),
+        "min_var": float(var_95.min()),
+        "volatility_trend": "stable"  # Placeholder until trend detection is implemented
     }
 
 async def log_calculation(calculation_id: str, portfolio_id: str, user_id: str, calculation_type: str):
     """Log calculation for audit purposes"""
     # Implement audit logging
     print(f"Logged calculation: {calculation_id} for user {user_id}")
-
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -8,41 +8,108 @@ import click
 import json
 import asyncio
 import aiohttp
+import orjson
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
+from rich.progress import Progress
 
 console = Console()
 
 class QuantumRiskCLI:
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    def __init__(self, base_url: str = "http://localhost:8000", token: Optional[str] = None):
         self.base_url = base_url.rstrip('/')
+        self.token = token
+        self._session: Optional[aiohttp.ClientSession] = None
         
-    async def calculate_var(self, portfolio_file: str, method: str = "quantum_mc"):
-        """Calculate VaR for portfolio"""
-        console.print(f"🔄 Calculating VaR using {method.upper()} method...")
+    async def __aenter__(self):
+        # One keep-alive session per CLI run, shared by every request
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60),
+            headers=headers
+        )
+        return self
+        
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
         
-        # Simulate API call
-        await asyncio.sleep(1.5)  # Simulate calculation time
+    async def _post_var(self, portfolio_file: str, method: str) -> Tuple[Dict, Dict]:
+        """POST one portfolio file to the VaR endpoint"""
+        with open(portfolio_file) as f:
+            portfolio = json.load(f)
         
-        # Mock results
-        results = {
-            "var_amount": 23450.32,
-            "confidence_level": 0.95,
-            "portfolio_value": 1000000,
-            "var_percentage": 2.35,
-            "method": method,
-            "quantum_enhanced": method == "quantum_mc",
-            "calculation_time": 1.2
+        payload = {
+            "portfolio_request": {
+                "portfolio_id": portfolio.get("portfolio_id") or portfolio["id"],
+                "name": portfolio.get("name"),
+                "positions": portfolio["positions"],
+                "base_currency": portfolio.get("base_currency", "USD")
+            },
+            "risk_params": {"method": method}
         }
         
-        # Display results
+        async with self._session.post(
+            f"{self.base_url}/api/portfolio/var", data=orjson.dumps(payload)
+        ) as response:
+            body = await response.read()
+            if response.status >= 400:
+                raise click.ClickException(
+                    f"API returned {response.status}: {body.decode(errors='replace')}"
+                )
+            return portfolio, orjson.loads(body)
+        
+    async def calculate_var(self, portfolio_files: List[str], method: str = "quantum_mc"):
+        """Calculate VaR for one or more portfolios concurrently"""
+        console.print(f"🔄 Calculating VaR using {method.upper()} method...")
+        
+        results: List[Union[Tuple[Dict, Dict], Exception]] = [None] * len(portfolio_files)
+        
+        async def run(index: int, portfolio_file: str):
+            try:
+                return index, await self._post_var(portfolio_file, method)
+            except (aiohttp.ClientError, click.ClickException, OSError, KeyError, ValueError) as e:
+                return index, e
+        
+        with Progress(console=console, transient=True) as progress:
+            task = progress.add_task("Calculating VaR", total=len(portfolio_files))
+            for completed in asyncio.as_completed(
+                [run(i, f) for i, f in enumerate(portfolio_files)]
+            ):
+                index, result = await completed
+                results[index] = result
+                progress.advance(task)
+        
+        for portfolio_file, result in zip(portfolio_files, results):
+            if isinstance(result, Exception):
+                message = result.format_message() if isinstance(result, click.ClickException) else str(result)
+                console.print(Panel(
+                    f"❌ {message}",
+                    title=f"VaR Calculation Failed: {portfolio_file}",
+                    border_style="red"
+                ))
+            else:
+                self._display_var(portfolio_file, method, *result)
+        
+    def _display_var(self, portfolio_file: str, method: str, portfolio: Dict, response: Dict):
+        """Render one VaR response"""
+        metrics = response["risk_metrics"]
+        quantum_enhanced = method == "quantum_mc" and response["methodology"]["quantum_enhancement"]
+        portfolio_value = portfolio.get("total_value") or sum(
+            pos.get("market_value") or 0.0 for pos in portfolio["positions"]
+        )
+        # The API reports risk per unit of portfolio weight, for the requested method
+        var_fraction = metrics["var"]
+        
         console.print(Panel(
             f"⚛️ Quantum Risk API CLI v1.0.0\n"
             f"📊 Portfolio: {portfolio_file}\n"
             f"🚀 Method: {method.upper()}\n"
-            f"⚛️ Quantum Enhanced: {'YES' if results['quantum_enhanced'] else 'NO'}",
+            f"⚛️ Quantum Enhanced: {'YES' if quantum_enhanced else 'NO'}",
             title="VaR Calculation Results",
             border_style="cyan"
         ))
@@ -51,10 +118,11 @@ class QuantumRiskCLI:
         table.add_column("Metric", style="cyan")
         table.add_column("Value", style="green")
         
-        table.add_row("VaR (95%)", f"${results['var_amount']:,.2f}")
-        table.add_row("Portfolio Value", f"${results['portfolio_value']:,.2f}")
-        table.add_row("VaR Percentage", f"{results['var_percentage']:.2f}%")
-        table.add_row("Calculation Time", f"{results['calculation_time']:.1f}s")
+        confidence_level = response["methodology"]["confidence_level"]
+        table.add_row(f"VaR ({confidence_level:.0%})", f"${var_fraction * portfolio_value:,.2f}")
+        table.add_row("Portfolio Value", f"${portfolio_value:,.2f}")
+        table.add_row("VaR Percentage", f"{var_fraction * 100:.2f}%")
+        table.add_row("Calculation Time", f"{response['computation_time_ms']:.1f}ms")
         
         console.print(table)
         console.print(f"\n✅ Calculation completed successfully!")
@@ -65,14 +133,21 @@ def cli():
     pass
 
 @cli.command()
-@click.option('--portfolio', '-p', required=True, help='Portfolio JSON file')
+@click.option('--portfolio', '-p', required=True, multiple=True,
+              help='Portfolio JSON file (repeat for several portfolios)')
 @click.option('--method', '-m', default='quantum_mc', 
               type=click.Choice(['quantum_mc', 'monte_carlo', 'historical', 'parametric']),
               help='VaR calculation method')
-def calculate(portfolio, method):
+@click.option('--api-url', default='http://localhost:8000', envvar='QRISK_API_URL',
+              help='Quantum Risk API base URL')
+@click.option('--token', envvar='QRISK_API_TOKEN', help='API bearer token')
+def calculate(portfolio, method, api_url, token):
     """Calculate portfolio risk metrics"""
-    client = QuantumRiskCLI()
-    asyncio.run(client.calculate_var(portfolio, method))
+    async def run():
+        async with QuantumRiskCLI(api_url, token) as client:
+            await client.calculate_var(list(portfolio), method)
+    
+    asyncio.run(run())
 
 @cli.command()
 def health():
@@ -4,6 +4,8 @@ Test suite for Quantum Risk API
 
 import pytest
 import asyncio
+import numpy as np
+import pandas as pd
 from fastapi.testclient import TestClient
 import sys
 import os
@@ -11,10 +13,178 @@ import os
 # Add API to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'api'))
 
+from main import app
+from core.auth import get_current_user
+from risk.calculations import Portfolio, QuantumPortfolioOptimizer, _historical_var_cvar, risk_engine
+from routes.risk_api import classify_stress_severity, get_redis, load_covariance_factors
+
+class InMemoryRedis:
+    """Dict-backed stand-in for the asyncio Redis client"""
+    
+    def __init__(self):
+        self.store = {}
+        self.hits = 0
+    
+    async def get(self, key):
+        value = self.store.get(key)
+        self.hits += value is not None
+        return value
+    
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+app.dependency_overrides[get_current_user] = lambda: {"user_id": "test-user"}
+client = TestClient(app)
+
 def test_api_health():
-    """Test API health endpoint"""
-    # Mock test - replace with actual API import
-    assert True  # Placeholder test
+    """Test API health endpoint is served by the mounted risk router"""
+    response = client.get("/health")
+    
+    assert response.status_code == 200
+    assert response.json()["status"] in ("healthy", "degraded")
+    assert client.get("/").json()["status"] == "operational"
+    assert {"/health", "/api/portfolio/var"} <= app.openapi()["paths"].keys()
+
+def test_request_body_schema_and_errors():
+    """Test raw-body routes keep their OpenAPI requestBody and FastAPI's 422 shape"""
+    paths = app.openapi()["paths"]
+    for path in ("/api/portfolio/var", "/api/portfolio/optimize", "/api/portfolio/stress-test"):
+        assert "application/json" in paths[path]["post"]["requestBody"]["content"]
+    
+    response = client.post("/api/portfolio/optimize", json={"symbols": ["AAPL"], "expected_returns": "x"})
+    
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "expected_returns"]
+
+def test_null_num_simulations_rejected():
+    """Test num_simulations cannot be null"""
+    response = client.post("/api/portfolio/var", json={
+        "portfolio_request": {
+            "portfolio_id": "p1",
+            "positions": [{"symbol": "AAPL", "weight": 1.0}]
+        },
+        "risk_params": {"method": "monte_carlo", "num_simulations": None}
+    })
+    
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "risk_params", "num_simulations"]
+
+def test_var_horizon_scaling_consistent():
+    """Test every method scales drift by T and volatility by sqrt(T)"""
+    returns = pd.DataFrame(
+        np.random.default_rng(7).normal(0.001, 0.02, (5000, 2)), columns=["AAPL", "MSFT"]
+    )
+    portfolio = Portfolio(
+        symbols=np.array(["AAPL", "MSFT"], dtype=object),
+        weights=np.array([0.6, 0.4]),
+        prices=np.array([150.0, 350.0]),
+        returns=returns
+    )
+    
+    results = {
+        method: risk_engine.calculate_var(portfolio, 0.95, time_horizon=10, method=method,
+                                          num_simulations=100000)
+        for method in ("parametric", "monte_carlo", "historical")
+    }
+    
+    parametric = results["parametric"]
+    for result in results.values():
+        assert abs(result["var_amount"] / parametric["var_amount"] - 1) < 0.05
+        assert abs(result["cvar_amount"] / parametric["cvar_amount"] - 1) < 0.05
+
+def test_quantum_mc_matches_parametric():
+    """Test Sobol quasi-Monte Carlo VaR agrees with the Gaussian closed form"""
+    returns = pd.DataFrame(
+        np.random.default_rng(11).normal(0.0005, 0.015, (1000, 3)), columns=["AAPL", "MSFT", "TSLA"]
+    )
+    portfolio = Portfolio(
+        symbols=np.array(["AAPL", "MSFT", "TSLA"], dtype=object),
+        weights=np.array([0.5, 0.3, 0.2]),
+        prices=np.array([150.0, 350.0, 800.0]),
+        returns=returns
+    )
+    
+    quantum = risk_engine.calculate_var(portfolio, 0.99, time_horizon=10, method="quantum_mc",
+                                        num_simulations=50000)
+    parametric = risk_engine.calculate_var(portfolio, 0.99, time_horizon=10, method="parametric")
+    
+    assert abs(quantum["var_amount"] / parametric["var_amount"] - 1) < 0.02
+    assert abs(quantum["cvar_amount"] / parametric["cvar_amount"] - 1) < 0.02
+
+def test_optimize_maps_weights_to_request_order():
+    """Test weights optimized in sorted-symbol order come back in request order"""
+    returns_by_symbol = {"MSFT": 0.10, "AAPL": 0.08, "TSLA": 0.15, "GOOGL": 0.12}
+    
+    weights_by_order = []
+    for symbols in (["MSFT", "AAPL", "TSLA", "GOOGL"], ["TSLA", "GOOGL", "AAPL", "MSFT"]):
+        response = client.post("/api/portfolio/optimize", json={
+            "symbols": symbols,
+            "expected_returns": [returns_by_symbol[symbol] for symbol in symbols]
+        })
+        assert response.status_code == 200
+        weights_by_order.append(dict(zip(symbols, response.json()["optimal_weights"])))
+    
+    covariance, _ = asyncio.run(load_covariance_factors(list(returns_by_symbol)))
+    mu = np.array([returns_by_symbol[symbol] for symbol in sorted(returns_by_symbol)])
+    z = np.linalg.solve(covariance, mu)
+    expected = dict(zip(sorted(returns_by_symbol), z / z.sum()))
+    
+    for weights in weights_by_order:
+        for symbol, weight in expected.items():
+            assert abs(weights[symbol] - weight) < 1e-9
+
+def test_simulation_methods_with_more_assets_than_observations():
+    """Test MC methods handle a rank-deficient sample covariance"""
+    symbols = [f"S{i}" for i in range(60)]
+    returns = pd.DataFrame(
+        np.random.default_rng(3).normal(0.0005, 0.02, (40, 60)), columns=symbols
+    )
+    portfolio = Portfolio(
+        symbols=np.array(symbols, dtype=object),
+        weights=np.full(60, 1 / 60),
+        prices=np.full(60, 100.0),
+        returns=returns
+    )
+    
+    parametric = risk_engine.calculate_var(portfolio, 0.95, method="parametric")
+    for method in ("monte_carlo", "quantum_mc"):
+        result = risk_engine.calculate_var(portfolio, 0.95, method=method, num_simulations=50000)
+        assert abs(result["var_amount"] / parametric["var_amount"] - 1) < 0.05
+
+def test_var_endpoint_caches_result():
+    """Test the VaR route caches per portfolio contents and parameters"""
+    redis_stub = InMemoryRedis()
+    app.dependency_overrides[get_redis] = lambda: redis_stub
+    body = {
+        "portfolio_request": {
+            "portfolio_id": "cache-test",
+            "positions": [
+                {"symbol": "AAPL", "weight": 0.6, "market_value": 600000},
+                {"symbol": "MSFT", "weight": 0.4, "market_value": 400000}
+            ]
+        },
+        "risk_params": {"method": "monte_carlo", "time_horizon": 5}
+    }
+    
+    try:
+        first = client.post("/api/portfolio/var", json=body)
+        second = client.post("/api/portfolio/var", json=body)
+        # Same portfolio_id and parameters with different holdings must miss the cache
+        body["portfolio_request"]["positions"] = [{"symbol": "TSLA", "weight": 1.0}]
+        third = client.post("/api/portfolio/var", json=body)
+    finally:
+        del app.dependency_overrides[get_redis]
+    
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert third.status_code == 200
+    assert redis_stub.hits == 1
+    assert third.json()["risk_metrics"]["var"] != first.json()["risk_metrics"]["var"]
+    metrics = first.json()["risk_metrics"]
+    assert metrics["cvar"] >= metrics["var"]
+    assert abs(metrics["var_percentage"] - metrics["var"] * 100) < 1e-9
+    assert second.json()["risk_metrics"] == metrics
+    assert second.json()["calculation_id"] != first.json()["calculation_id"]
 
 def test_var_calculation():
     """Test VaR calculation endpoint"""
@@ -39,5 +209,61 @@ def test_quantum_enhancement():
     
     assert improvement > 0.2  # 20% improvement expected
 
+def test_historical_var_kernel():
+    """Test JIT historical VaR/CVaR kernel against its pure-Python version"""
+    rng = np.random.default_rng(42)
+    returns = rng.normal(0.0005, 0.02, (500, 4))
+    weights = np.array([0.4, 0.3, 0.2, 0.1])
+    
+    var, cvar = _historical_var_cvar(returns, weights, 0.05)
+    var_py, cvar_py = _historical_var_cvar.py_func(returns, weights, 0.05)
+    
+    assert var > 0
+    assert cvar >= var
+    assert abs(var - var_py) < 1e-9
+    assert abs(cvar - cvar_py) < 1e-9
+
+def test_stress_test_impacts():
+    """Test stress scenarios are applied as one shock-matrix product"""
+    portfolio = Portfolio(
+        symbols=np.array(["AAPL", "GOOGL", "TSLA"], dtype=object),
+        weights=np.array([0.5, 0.3, 0.2]),
+        prices=np.array([150.0, 2800.0, 800.0])
+    )
+    scenarios = {
+        "tech_crash": {"AAPL": -0.2, "GOOGL": -0.3},
+        "ev_rally": {"TSLA": 0.5, "NFLX": -0.9}
+    }
+    
+    names, impacts = risk_engine.stress_test_portfolio(portfolio, scenarios)
+    
+    assert names == ["tech_crash", "ev_rally"]
+    assert np.allclose(impacts, [-0.19, 0.10])
+
+def test_stress_severity_edges():
+    """Test severity bands are upper-inclusive and only a zero or gain is positive"""
+    impacts = np.array([-0.30, -0.15, -0.05, -1e-300, 0.0])
+    
+    severities = classify_stress_severity(impacts)
+    
+    assert severities.tolist() == ["severe", "high", "moderate", "low", "positive"]
+
+def test_closed_form_optimization():
+    """Test unconstrained optimization returns the tangency portfolio without iterating"""
+    expected_returns = np.array([0.08, 0.12, 0.10])
+    covariance = np.array([
+        [0.040, 0.006, 0.004],
+        [0.006, 0.090, 0.010],
+        [0.004, 0.010, 0.060]
+    ])
+    
+    result = QuantumPortfolioOptimizer().optimize_portfolio(expected_returns, covariance)
+    
+    z = np.linalg.solve(covariance, expected_returns)
+    assert np.allclose(result["weights"], z / z.sum())
+    assert result["iterations"] == 0
+    assert result["success"]
+    assert abs(result["volatility"] ** 2 - result["weights"] @ covariance @ result["weights"]) < 1e-12
+
 if __name__ == "__main__":
     pytest.main([__file__])